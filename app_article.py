@@ -1,13 +1,18 @@
 import streamlit as st
 import os
 import sys
+import time
+from functools import partial
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent))
 
 from src.models.image_generator import ImageGenerator
 from src.utils.article_processor import ArticleProcessor
-from config.settings import PATHS
+from src.utils.image_store import ImageStore
+from config.settings import PATHS, PROMPT_CONFIG, IMAGE_STORE_CONFIG, DEDUP_CONFIG, MODEL_CONFIG, MODEL_REGISTRY_CONFIG, ADAPTER_CONFIG
+
+QUALITY_SUFFIX = "raw photo, 8k uhd, dslr, soft lighting, high quality, film grain, photorealistic, professional photography"
 
 st.set_page_config(
     page_title="Talrn AI Assignment - Image Generator",
@@ -21,6 +26,14 @@ if "prompts" not in st.session_state:
     st.session_state.prompts = []
 if "current_article" not in st.session_state:
     st.session_state.current_article = None
+if "download_path" not in st.session_state:
+    st.session_state.download_path = None
+if "gallery_page" not in st.session_state:
+    st.session_state.gallery_page = 1
+if "dedup_report" not in st.session_state:
+    st.session_state.dedup_report = None
+if "renders_avoided" not in st.session_state:
+    st.session_state.renders_avoided = 0
 
 @st.cache_resource
 def load_core():
@@ -34,6 +47,61 @@ except Exception as e:
     st.info("💡 Make sure your GROQ_API_KEY is set in the .env file")
     st.stop()
 
+store = ImageStore()
+
+def fetch_prompts(filepath, article, max_concepts, model_id=None):
+    with generator.request_log.capture("prompts", article=article, max_concepts=max_concepts) as record:
+        start = time.perf_counter()
+        data = processor.process_article(filepath, max_concepts=max_concepts)
+        record["timings"]["llm_s"] = time.perf_counter() - start
+        record["llm_calls"] = 1
+        
+        if "error" in data:
+            record["outcome"] = "error"
+            record["error"] = data["error"]
+            return data
+        
+        start = time.perf_counter()
+        result = generator.deduplicator.deduplicate(data["concepts"], article, model_id)
+        record["timings"]["dedup_s"] = time.perf_counter() - start
+        kept = result["kept"]
+        result["retry_dropped"] = []
+        
+        for _ in range(DEDUP_CONFIG["max_rerequests"]):
+            if len(kept) >= max_concepts:
+                break
+            record["llm_calls"] += 1
+            retry = processor.process_article(filepath, max_concepts=max_concepts)
+            if "error" in retry:
+                break
+            retry_result = generator.deduplicator.deduplicate(kept + retry["concepts"], article, model_id)
+            result["retry_dropped"].extend(retry_result["dropped"])
+            kept = retry_result["kept"][:max_concepts]
+        
+        result["kept"] = kept
+        processor.index.record_concepts(filepath, kept)
+        record["cache"]["renders_avoided"] = result["renders_avoided"]
+        record["num_concepts"] = len(kept)
+        
+        st.session_state.renders_avoided += result["renders_avoided"]
+        st.session_state.dedup_report = result
+        data["concepts"] = kept
+        return data
+
+def download_control(path, key):
+    if st.session_state.download_path == path:
+        st.download_button(
+            "⬇️ Download PNG",
+            store.read_bytes(path),
+            os.path.basename(path),
+            "image/png",
+            key=f"download_{key}",
+            width="stretch"
+        )
+    elif st.button("📥 Prepare Download", key=f"prepare_{key}", width="stretch"):
+        st.session_state.download_path = path
+        st.rerun()
+
 with st.sidebar:
     st.header("⚙️ Generation Settings")
     
@@ -117,6 +185,35 @@ with st.sidebar:
             with col2:
                 height = st.selectbox("Height", [512, 768, 1024], index=1)
     
+    st.markdown("---")
+    st.subheader("🧩 Model")
+    
+    available_models = MODEL_REGISTRY_CONFIG["available_models"]
+    model_id = st.selectbox(
+        "Checkpoint",
+        available_models,
+        index=available_models.index(MODEL_CONFIG["model_id"]) if MODEL_CONFIG["model_id"] in available_models else 0,
+        help="Switching loads the checkpoint once; recently used checkpoints stay resident"
+    )
+    
+    registry_report = generator.registry.report()
+    st.caption(
+        f"Resident: {len(registry_report['resident_models'])}/{generator.registry.max_resident} model(s), "
+        f"{registry_report['resident_gb']:.2f} GB, "
+        f"{registry_report['shared_components']} shared component(s). "
+        f"Last swap: {registry_report['last_swap_seconds']:.1f}s"
+    )
+    
+    adapters = None
+    if ADAPTER_CONFIG["adapters"]:
+        selected_adapters = st.multiselect(
+            "House Style (LoRA)",
+            list(ADAPTER_CONFIG["adapters"]),
+            help="Adapters are fused into the resident model and swapped in milliseconds"
+        )
+        adapter_scale = st.slider("Style Strength", 0.0, 1.5, 1.0, 0.1) if selected_adapters else 1.0
+        adapters = {name: adapter_scale for name in selected_adapters}
+    
     st.markdown("---")
     st.subheader("🎲 Advanced Options")
     
@@ -125,6 +222,12 @@ with st.sidebar:
     if use_seed:
         seed = st.number_input("Seed", min_value=0, max_value=999999, value=42, help="Same seed = same image")
     
+    long_prompt = st.checkbox(
+        "Long Prompts (chunked)",
+        value=PROMPT_CONFIG["long_prompts"],
+        help="Encode prompts over 77 tokens in chunks instead of dropping low-priority quality keywords"
+    )
+    
     st.markdown("---")
     st.info(f"""
     **Current Settings:**
@@ -150,6 +253,8 @@ with st.sidebar:
         st.session_state.current_images = []
         st.session_state.prompts = []
         st.session_state.current_article = None
+        st.session_state.download_path = None
+        st.session_state.dedup_report = None
         st.rerun()
 
 st.title("📰 AI Article-to-Image Generator")
@@ -170,7 +275,8 @@ with col_input:
         st.info("💡 Add .docx files to the Articles folder and refresh the page")
         st.stop()
     
-    st.caption(f"Found {len(articles)} article(s) in the Articles directory")
+    changed_articles = processor.get_changed_articles(scan=False)
+    st.caption(f"Found {len(articles)} article(s) in the Articles directory ({len(changed_articles)} new or changed since their last prompts)")
     
     selected_file = st.selectbox(
         "Choose an article:",
@@ -198,7 +304,7 @@ with col_input:
             st.session_state.current_images = []
             
             with st.spinner("🤖 AI is analyzing the article and creating visual prompts..."):
-                data = processor.process_article(selected_file, max_concepts=num_concepts)
+                data = fetch_prompts(selected_file, article_name, num_concepts, model_id)
                 
                 if "error" in data:
                     st.error(f"❌ Error: {data['error']}")
@@ -215,7 +321,7 @@ with col_input:
                 st.session_state.current_images = []
                 
                 with st.spinner("🤖 Generating new prompts..."):
-                    data = processor.process_article(selected_file, max_concepts=num_concepts)
+                    data = fetch_prompts(selected_file, article_name, num_concepts, model_id)
                     
                     if "error" in data:
                         st.error(f"❌ Error: {data['error']}")
@@ -230,6 +336,20 @@ with col_input:
         st.caption(f"**Article:** {st.session_state.current_article}")
         st.info("These prompts are generated from your article content. If you don't like them, click 'Regenerate' above.")
         
+        report = st.session_state.dedup_report
+        if report and report["dropped"]:
+            st.warning(f"♻️ Skipped {report['renders_avoided']} near-duplicate scene(s) ({st.session_state.renders_avoided} render(s) avoided this session)")
+        if report and (report["dropped"] or report["retry_dropped"]):
+            with st.expander("Skipped scenes"):
+                for item in report["dropped"]:
+                    st.caption(f"**{item['similarity']:.2f}** similar to: {item['duplicate_of']}")
+                    st.write(item["concept"])
+                if report["retry_dropped"]:
+                    st.caption("Also skipped while re-requesting scenes to refill the batch:")
+                    for item in report["retry_dropped"]:
+                        st.caption(f"**{item['similarity']:.2f}** similar to: {item['duplicate_of']}")
+                        st.write(item["concept"])
+        
         for i, prompt in enumerate(st.session_state.prompts):
             with st.expander(f"🎨 Scene {i+1}", expanded=True):
                 st.write(prompt)
@@ -244,47 +364,74 @@ with col_input:
             progress_bar = st.progress(0)
             status_text = st.empty()
             
+            article = st.session_state.current_article
+            pending = []
+            
+            def save_rendered(prompt, images):
+                path, meta_path = generator.save_image(
+                    images[0],
+                    prompt,
+                    {
+                        "source": article,
+                        "steps": steps,
+                        "cfg_scale": cfg,
+                        "height": height,
+                        "width": width,
+                        "adapters": adapters
+                    },
+                    article_name=article.replace('.docx', ''),
+                    model_id=model_id
+                )
+                
+                return {
+                    "path": path,
+                    "thumbnail": store.get_thumbnail(path, images[0]),
+                    "prompt": prompt,
+                    "article": article,
+                    "model_id": model_id
+                }
+            
             for idx, prompt in enumerate(st.session_state.prompts):
                 status_text.text(f"🎨 Rendering scene {idx+1}/{len(st.session_state.prompts)}... (30-60 seconds)")
                 
-                enhanced_prompt = f"{prompt}, raw photo, 8k uhd, dslr, soft lighting, high quality, film grain, photorealistic, professional photography"
+                request = {
+                    "prompt": f"{prompt}, {QUALITY_SUFFIX}",
+                    "num_images": 1,
+                    "steps": steps,
+                    "cfg_scale": cfg,
+                    "height": height,
+                    "width": width,
+                    "seed": seed,
+                    "long_prompt": long_prompt,
+                    "model_id": model_id,
+                    "adapters": adapters
+                }
                 
                 try:
-                    imgs = generator.generate(
-                        enhanced_prompt,
-                        num_images=1,
-                        steps=steps,
-                        cfg_scale=cfg,
-                        height=height,
-                        width=width,
-                        seed=seed
-                    )
-                    
-                    path, meta_path = generator.save_image(
-                        imgs[0],
-                        prompt,
-                        {
-                            "source": st.session_state.current_article,
-                            "steps": steps,
-                            "cfg_scale": cfg,
-                            "height": height,
-                            "width": width
-                        },
-                        article_name=st.session_state.current_article.replace('.docx', '')
-                    )
-                    
-                    st.session_state.current_images.append({
-                        "image": imgs[0],
-                        "path": path,
-                        "prompt": prompt,
-                        "article": st.session_state.current_article
-                    })
+                    if generator.pipelined_decode:
+                        latents, lease = generator.generate(**request, output_type="latent")
+                        pending.append((idx, generator.submit_decode(latents, lease, partial(save_rendered, prompt))))
+                    else:
+                        st.session_state.current_images.append(save_rendered(prompt, generator.generate(**request)))
                     
                 except Exception as e:
                     st.error(f"❌ Error generating image {idx+1}: {e}")
                 
                 progress_bar.progress((idx + 1) / len(st.session_state.prompts))
             
+            if pending:
+                status_text.text("🖼️ Decoding final image...")
+            for idx, future in pending:
+                try:
+                    st.session_state.current_images.append(future.result())
+                except Exception as e:
+                    st.error(f"❌ Error generating image {idx+1}: {e}")
+            
+            generator.deduplicator.record(
+                st.session_state.current_article,
+                [img["prompt"] for img in st.session_state.current_images]
+            )
+            
             status_text.text("✅ All images generated!")
             st.success(f"🎉 Successfully generated {len(st.session_state.prompts)} photorealistic images!")
             st.balloons()
@@ -320,17 +467,8 @@ with col_output:
                 col1, col2 = st.columns([1, 2])
                 
                 with col1:
-                    st.image(img_data["image"], width="stretch")
-                    
-                    with open(img_data["path"], "rb") as f:
-                        st.download_button(
-                            "⬇️ Download PNG",
-                            f,
-                            os.path.basename(img_data["path"]),
-                            "image/png",
-                            key=f"download_{idx}",
-                            width="stretch"
-                        )
+                    st.image(img_data["thumbnail"], width="stretch")
+                    download_control(img_data["path"], f"current_{idx}")
                 
                 with col2:
                     st.markdown("**📝 AI-Generated Prompt:**")
@@ -339,9 +477,9 @@ with col_output:
                     with st.expander("🔧 Technical Details"):
                         st.caption(f"""
                         **Enhanced Prompt:**  
-                        {img_data['prompt']}, raw photo, 8k uhd, dslr, soft lighting, high quality, film grain, photorealistic, professional photography
+                        {img_data['prompt']}, {QUALITY_SUFFIX}
                         
-                        **Model:** Realistic Vision V6.0  
+                        **Model:** {img_data['model_id']}  
                         **Resolution:** {width}x{height}  
                         **Quality:** Photorealistic
                         """)
@@ -350,3 +488,31 @@ with col_output:
         
         st.markdown("---")
         st.info("💡 **Tip:** To generate images from a different article, select it from the dropdown and click 'Generate Prompts' again.")
+
+st.markdown("---")
+st.subheader("🗂️ Gallery")
+
+if st.toggle("Browse all generated images", key="show_gallery", help="The gallery only scans generated_images/ while it is open"):
+    gallery = store.page(st.session_state.gallery_page)
+    
+    if not gallery["total"]:
+        st.info(f"No images found in `{store.output_dir}/` yet")
+    else:
+        st.caption(f"{gallery['total']} image(s) - page {gallery['page']} of {gallery['num_pages']}")
+        
+        col_prev, _, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("⬅️ Previous", disabled=gallery["page"] <= 1, width="stretch"):
+                st.session_state.gallery_page = gallery["page"] - 1
+                st.rerun()
+        with col_next:
+            if st.button("Next ➡️", disabled=gallery["page"] >= gallery["num_pages"], width="stretch"):
+                st.session_state.gallery_page = gallery["page"] + 1
+                st.rerun()
+        
+        columns = st.columns(IMAGE_STORE_CONFIG["gallery_columns"])
+        for idx, item in enumerate(gallery["items"]):
+            with columns[idx % len(columns)]:
+                st.image(item["thumbnail"], width="stretch")
+                st.caption(item["prompt"][:120])
+                download_control(item["path"], f"gallery_{os.path.basename(item['path'])}")
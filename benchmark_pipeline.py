@@ -0,0 +1,79 @@
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.models.image_generator import ImageGenerator
+from src.utils.request_log import RequestLog
+
+CONCEPTS = [
+    "A modern newsroom with journalists working at desks, natural daylight, wide angle shot",
+    "Close-up of a reporter's notebook and microphone on a wooden table, soft studio lighting",
+    "Aerial view of a city skyline at golden hour, documentary style",
+    "Crowd gathered in a public square holding signs, overcast daylight, medium shot",
+    "Solar panels on a rooftop under a clear blue sky, rule of thirds composition",
+]
+
+
+def run_sequential(generator, requests, output_dir):
+    start = time.perf_counter()
+    for request in requests:
+        images = generator.generate(**request)
+        generator.save_image(images[0], request["prompt"], {}, output_dir=output_dir)
+    return time.perf_counter() - start
+
+
+def run_pipelined(generator, requests, output_dir):
+    def save(i, images):
+        return generator.save_image(images[0], requests[i]["prompt"], {}, output_dir=output_dir)
+
+    start = time.perf_counter()
+    generator.generate_pipelined(requests, save)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sequential vs pipelined VAE decode throughput")
+    parser.add_argument("--device", default=None, help="cuda or cpu (default: auto)")
+    parser.add_argument("--concepts", type=int, default=5, help="Number of concepts per simulated article")
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--height", type=int, default=512)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--repeats", type=int, default=1, help="Timed runs per mode (best is reported)")
+    args = parser.parse_args()
+
+    generator = ImageGenerator(device=args.device, request_log=RequestLog(enabled=False))
+    requests = [
+        {
+            "prompt": CONCEPTS[i % len(CONCEPTS)],
+            "num_images": 1,
+            "steps": args.steps,
+            "height": args.height,
+            "width": args.width,
+            "seed": i
+        }
+        for i in range(args.concepts)
+    ]
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        print("\n🔥 Warm-up run...")
+        run_sequential(generator, requests[:1], output_dir)
+
+        timings = {}
+        for name, runner in (("sequential", run_sequential), ("pipelined", run_pipelined)):
+            timings[name] = min(runner(generator, requests, output_dir) for _ in range(args.repeats))
+
+    print("\n" + "=" * 60)
+    print(f"📊 PIPELINE BENCHMARK ({generator.device}, {args.concepts} concepts, "
+          f"{args.steps} steps, {args.width}x{args.height})")
+    print("=" * 60)
+    for name, seconds in timings.items():
+        print(f"{name:>10}: {seconds:7.2f}s  ->  {args.concepts / seconds * 60:6.2f} images/min")
+    print(f"{'gain':>10}: {(timings['sequential'] / timings['pipelined'] - 1) * 100:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,29 @@ MODEL_CONFIG = {
     "enable_vae_slicing": True,
 }
 
+MODEL_REGISTRY_CONFIG = {
+    "max_resident": 2,
+    "memory_budget_gb": None,
+    "memory_budget_fraction": 0.85,
+    "shared_components": ["vae", "text_encoder", "tokenizer"],
+    "available_models": [
+        "SG161222/Realistic_Vision_V6.0_B1_noVAE",
+        "SG161222/Realistic_Vision_V5.1_noVAE",
+        "stable-diffusion-v1-5/stable-diffusion-v1-5",
+    ],
+}
+
+ADAPTER_CONFIG = {
+    "adapters": {},
+    "style_adapters": {},
+    "fused_cache_size": 4,
+}
+
+DECODE_CONFIG = {
+    "chunk_size": 1,
+    "pipelined": True,
+}
+
 GENERATION_CONFIG = {
     "default_steps": 40,
     "default_cfg_scale": 5.0,
@@ -20,8 +43,36 @@ ARTICLE_CONFIG = {
     "quality_keywords": ["highly detailed", "8k", "photorealistic", "professional photography", "crisp", "sharp focus"],
 }
 
+PROMPT_CONFIG = {
+    "token_budget": None,
+    "long_prompts": False,
+    "token_cache_size": 4096,
+}
+
+DEDUP_CONFIG = {
+    "similarity_threshold": 0.92,
+    "history_size": 50,
+    "max_rerequests": 1,
+    "embedding_cache_size": 1024,
+}
+
+IMAGE_STORE_CONFIG = {
+    "thumbnail_dir": ".thumbnails",
+    "thumbnail_size": 384,
+    "thumbnail_quality": 80,
+    "gallery_page_size": 12,
+    "gallery_columns": 4,
+}
+
+REQUEST_LOG_CONFIG = {
+    "enabled": True,
+    "path": "requests.jsonl",
+}
+
 PATHS = {
     "articles_dir": "Articles",
     "output_dir": "generated_images",
-    "models_cache": ".cache/models"
+    "models_cache": ".cache/models",
+    "corpus_index": ".cache/corpus_index.json",
+    "corpus_text": ".cache/corpus_text"
 }
@@ -0,0 +1,169 @@
+import argparse
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from src.utils.request_log import RequestLog
+from config.settings import REQUEST_LOG_CONFIG
+
+
+class StubGenerator:
+
+    def __init__(self, seconds_per_step: float = 0.35, service_scale: float = 1.0):
+        self.seconds_per_step = seconds_per_step
+        self.service_scale = service_scale
+
+    def service_time(self, record):
+        timings = record.get("timings", {})
+        recorded = timings.get("pipe_s")
+        if recorded is None:
+            params = record["params"]
+            pixels = (params.get("height") or 768) * (params.get("width") or 768) / (512 * 512)
+            recorded = params.get("steps", 50) * self.seconds_per_step * pixels * params.get("num_images", 1)
+        for key in ("model_s", "adapter_swap_s", "decode_s", "postprocess_s"):
+            recorded += timings.get(key, 0.0)
+        return recorded * self.service_scale
+
+    def replay(self, record):
+        time.sleep(self.service_time(record))
+
+
+class LiveGenerator:
+
+    def __init__(self):
+        from src.models.image_generator import ImageGenerator
+        self.generator = ImageGenerator(request_log=RequestLog(enabled=False))
+
+    def replay(self, record):
+        result = self.generator.generate(**record["params"])
+        if record["params"].get("output_type") == "latent":
+            latents, lease = result
+            self.generator.submit_decode(latents, lease).result()
+
+
+def load_trace(path):
+    records = RequestLog.read(path, events=["generate", "decode"])
+    requests = {r["id"]: r for r in records if r["event"] == "generate" and "id" in r}
+
+    for record in records:
+        request = requests.get(record.get("request_id")) if record["event"] == "decode" else None
+        if request is not None:
+            for key in ("decode_s", "postprocess_s"):
+                if key in record["timings"]:
+                    request["timings"][key] = request["timings"].get(key, 0.0) + record["timings"][key]
+
+    return [r for r in records if r["event"] == "generate"]
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * q / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def replay(records, backend, speed: float = 1.0, workers: int = 1):
+    jobs = queue.Queue()
+    results = []
+    results_lock = threading.Lock()
+
+    def worker():
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            arrival, record = job
+            started = time.perf_counter()
+            outcome = "ok"
+            try:
+                backend.replay(record)
+            except Exception as e:
+                outcome = f"error: {e}"
+            finished = time.perf_counter()
+            with results_lock:
+                results.append({
+                    "queue_s": started - arrival,
+                    "service_s": finished - started,
+                    "latency_s": finished - arrival,
+                    "finished": finished,
+                    "outcome": outcome
+                })
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+
+    origin = records[0]["ts"]
+    start = time.perf_counter()
+    for record in records:
+        delay = (record["ts"] - origin) / speed - (time.perf_counter() - start)
+        if delay > 0:
+            time.sleep(delay)
+        jobs.put((time.perf_counter(), record))
+
+    for _ in threads:
+        jobs.put(None)
+    for t in threads:
+        t.join()
+
+    makespan = max(r["finished"] for r in results) - start
+    return results, makespan
+
+
+def report(results, makespan, trace_span, speed, workers):
+    ok = [r for r in results if r["outcome"] == "ok"]
+    print("=" * 60)
+    print("📈 REPLAY REPORT")
+    print("=" * 60)
+    print(f"Requests: {len(results)} ({len(results) - len(ok)} failed), workers: {workers}, speed: {speed}x")
+    print(f"Trace span: {trace_span:.1f}s recorded -> {trace_span / speed:.1f}s replayed, makespan {makespan:.1f}s")
+    print(f"Throughput: {len(ok) / makespan * 60:.2f} requests/min" if makespan else "Throughput: n/a")
+    print(f"Offered load: {len(results) / max(trace_span / speed, 1e-9) * 60:.2f} requests/min")
+    print(f"Utilisation: {sum(r['service_s'] for r in results) / (makespan * workers) * 100:.0f}%" if makespan else "Utilisation: n/a")
+
+    for key, label in (("queue_s", "Queueing delay"), ("service_s", "Service time"), ("latency_s", "Latency")):
+        values = [r[key] for r in results]
+        print(f"{label:>15}: p50 {percentile(values, 50):7.2f}s  p90 {percentile(values, 90):7.2f}s  "
+              f"p99 {percentile(values, 99):7.2f}s  max {max(values):7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded request trace to size capacity")
+    parser.add_argument("--trace", default=REQUEST_LOG_CONFIG["path"], help="JSONL trace written by RequestLog")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time-scale factor (10 = arrivals 10x faster)")
+    parser.add_argument("--workers", type=int, default=1, help="Concurrent generator workers to simulate")
+    parser.add_argument("--live", action="store_true", help="Replay into a real ImageGenerator instead of the stand-in")
+    parser.add_argument("--service-scale", type=float, default=1.0, help="Stand-in only: scale recorded service times")
+    parser.add_argument("--seconds-per-step", type=float, default=0.35, help="Stand-in only: fallback cost per step at 512x512")
+    parser.add_argument("--include-failed", action="store_true", help="Also replay requests that failed when recorded")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N requests")
+    args = parser.parse_args()
+
+    records = load_trace(args.trace)
+    if not args.include_failed:
+        records = [r for r in records if r.get("outcome") == "ok"]
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        print(f"❌ No generate requests found in {args.trace}")
+        sys.exit(1)
+
+    if args.live:
+        backend = LiveGenerator()
+    else:
+        backend = StubGenerator(args.seconds_per_step, args.service_scale)
+
+    trace_span = records[-1]["ts"] - records[0]["ts"]
+    print(f"▶ Replaying {len(records)} request(s) from {args.trace} ({'live' if args.live else 'stand-in'} pipeline)")
+    results, makespan = replay(records, backend, args.speed, args.workers)
+    report(results, makespan, trace_span, args.speed, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import torch
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import ADAPTER_CONFIG
+
+
+class AdapterManager:
+
+    def __init__(self, pipe, cache_size: Optional[int] = None):
+        self.pipe = pipe
+        self.cache_size = cache_size or ADAPTER_CONFIG["fused_cache_size"]
+        self.loaded = set()
+        self.active: Tuple = ()
+        self.lock = threading.RLock()
+        self.stats = {"swaps": 0, "fused_hits": 0, "last_swap_ms": 0.0}
+        self._layers: Dict[str, torch.nn.Module] = {}
+        self._base: Dict[str, torch.Tensor] = {}
+        self._fused: "OrderedDict[Tuple, Dict[str, torch.Tensor]]" = OrderedDict()
+
+    @staticmethod
+    def combo_key(adapters: Optional[Dict[str, float]]) -> Tuple:
+        if not adapters:
+            return ()
+        return tuple(sorted((name, float(weight)) for name, weight in adapters.items() if weight))
+
+    def _offload(self, tensor: torch.Tensor) -> torch.Tensor:
+        tensor = tensor.detach().to("cpu", copy=True)
+        if torch.cuda.is_available():
+            tensor = tensor.pin_memory()
+        return tensor
+
+    def load(self, name: str):
+        if name in self.loaded:
+            return
+        if name not in ADAPTER_CONFIG["adapters"]:
+            raise ValueError(f"Unknown adapter '{name}'. Add it to ADAPTER_CONFIG['adapters'] in config/settings.py")
+
+        source = ADAPTER_CONFIG["adapters"][name]
+        start = time.perf_counter()
+
+        state_dict, network_alphas = self.pipe.lora_state_dict(
+            source["path"],
+            weight_name=source.get("weight_name")
+        )
+        self.pipe.load_lora_into_unet(
+            state_dict,
+            network_alphas=network_alphas,
+            unet=self.pipe.unet,
+            adapter_name=name,
+            _pipeline=self.pipe
+        )
+        self.pipe.unet.disable_lora()
+
+        for module_name, module in self.pipe.unet.named_modules():
+            if hasattr(module, "lora_A") and hasattr(module, "base_layer") and module_name not in self._layers:
+                self._layers[module_name] = module
+                self._base[module_name] = self._offload(module.base_layer.weight)
+
+        self.loaded.add(name)
+        print(f"   ✓ Adapter '{name}' loaded in {time.perf_counter() - start:.2f}s")
+
+    def _touched(self, combo: Tuple):
+        names = {name for name, _ in combo}
+        return {
+            layer_name for layer_name, layer in self._layers.items()
+            if names & set(layer.lora_A.keys())
+        }
+
+    def _fuse(self, combo: Tuple) -> Dict[str, torch.Tensor]:
+        if combo in self._fused:
+            self._fused.move_to_end(combo)
+            self.stats["fused_hits"] += 1
+            return self._fused[combo]
+
+        fused = {}
+        for layer_name in self._touched(combo):
+            layer = self._layers[layer_name]
+            weight = self._base[layer_name].to(layer.base_layer.weight.device, dtype=torch.float32, copy=True)
+            for name, scale in combo:
+                if name in layer.lora_A:
+                    weight += scale * layer.get_delta_weight(name).float()
+            fused[layer_name] = self._offload(weight.to(layer.base_layer.weight.dtype))
+
+        self._fused[combo] = fused
+        while len(self._fused) > self.cache_size:
+            self._fused.popitem(last=False)
+        return fused
+
+    def activate(self, adapters: Optional[Dict[str, float]] = None) -> Tuple:
+        combo = self.combo_key(adapters)
+
+        with self.lock:
+            if combo == self.active:
+                return combo
+
+            start = time.perf_counter()
+            for name, _ in combo:
+                self.load(name)
+
+            fused = self._fuse(combo) if combo else {}
+            with torch.no_grad():
+                for layer_name in self._touched(self.active) | set(fused):
+                    source = fused.get(layer_name, self._base[layer_name])
+                    self._layers[layer_name].base_layer.weight.copy_(source, non_blocking=True)
+            if torch.cuda.is_available():
+                torch.cuda.synchronize()
+
+            self.active = combo
+            self.stats["swaps"] += 1
+            self.stats["last_swap_ms"] = (time.perf_counter() - start) * 1000
+            print(f"   ↻ Adapters {dict(combo) or 'none'} active in {self.stats['last_swap_ms']:.0f}ms")
+            return combo
@@ -1,18 +1,33 @@
 import torch
-from diffusers import StableDiffusionPipeline, DPMSolverMultistepScheduler
+from diffusers import StableDiffusionPipeline
 import os
+import time
 from datetime import datetime
 import json
 from PIL import Image
-from typing import List, Optional
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.settings import MODEL_CONFIG, GENERATION_CONFIG, PATHS
+from config.settings import MODEL_CONFIG, GENERATION_CONFIG, PROMPT_CONFIG, ADAPTER_CONFIG, DECODE_CONFIG, PATHS
+from src.utils.prompt_compiler import PromptCompiler
+from src.utils.concept_deduplicator import ConceptDeduplicator
+from src.utils.request_log import RequestLog
+from src.models.model_registry import ModelRegistry
+from src.models.adapter_manager import AdapterManager
+from src.models.latent_decoder import LatentDecoder
 
 
 class ImageGenerator:
     
-    def __init__(self, model_id: Optional[str] = None, device: Optional[str] = None):
+    def __init__(
+        self,
+        model_id: Optional[str] = None,
+        device: Optional[str] = None,
+        registry: Optional[ModelRegistry] = None,
+        request_log: Optional[RequestLog] = None
+    ):
         self.model_id = model_id or MODEL_CONFIG["model_id"]
         
         if device:
@@ -26,27 +41,14 @@ class ImageGenerator:
             print(f"   GPU: {torch.cuda.get_device_name(0)}")
             print(f"   CUDA Version: {torch.version.cuda}")
         
+        self.registry = registry or ModelRegistry(self.device)
+        self.request_log = request_log or RequestLog()
+        self._compilers = {}
+        
         try:
-            self.pipe = StableDiffusionPipeline.from_pretrained(
-                self.model_id,
-                torch_dtype=torch.float16 if self.device == "cuda" else torch.float32,
-                safety_checker=None,
-            )
-            
-            self.pipe.scheduler = DPMSolverMultistepScheduler.from_config(
-                self.pipe.scheduler.config
-            )
-            
-            self.pipe.to(self.device)
-            
-            if self.device == "cuda":
-                self.pipe.enable_attention_slicing()
-                self.pipe.enable_vae_slicing()
-                try:
-                    self.pipe.enable_xformers_memory_efficient_attention()
-                    print("   ✓ XFormers enabled for better performance")
-                except Exception:
-                    print("   ⚠ XFormers not available, using standard attention")
+            self.get_prompt_compiler()
+            self.deduplicator = ConceptDeduplicator(self.registry.resident_text_encoder, self.device)
+            self.decoder = LatentDecoder(self.device)
             
             print("✅ Model loaded successfully!")
             
@@ -54,6 +56,25 @@ class ImageGenerator:
             print(f"❌ Error loading model: {e}")
             raise e
     
+    @property
+    def pipe(self) -> StableDiffusionPipeline:
+        return self.registry.get(self.model_id)
+    
+    def get_prompt_compiler(
+        self,
+        model_id: Optional[str] = None,
+        pipe: Optional[StableDiffusionPipeline] = None
+    ) -> PromptCompiler:
+        model_id = model_id or self.model_id
+        if pipe is None:
+            pipe = self.registry.get(model_id)
+        tokenizer = pipe.tokenizer
+        compiler = self._compilers.get(model_id)
+        if compiler is None or compiler.tokenizer is not tokenizer:
+            compiler = PromptCompiler(tokenizer)
+            self._compilers[model_id] = compiler
+        return compiler
+    
     def generate(
         self,
         prompt: str,
@@ -63,41 +84,205 @@ class ImageGenerator:
         cfg_scale: float = 7.5,
         height: int = 768,
         width: int = 768,
-        seed: Optional[int] = None
-    ) -> List[Image.Image]:
-        
-        if negative_prompt is None:
-            negative_prompt = GENERATION_CONFIG["negative_prompt_default"]
+        seed: Optional[int] = None,
+        long_prompt: Optional[bool] = None,
+        model_id: Optional[str] = None,
+        adapters: Optional[Dict[str, float]] = None,
+        output_type: str = "pil"
+    ):
         
-        safety_negative = "nsfw, nude, naked, sexual, explicit, adult content, inappropriate, vulgar, offensive, violence, gore, disturbing"
-        negative_prompt = f"{negative_prompt}, {safety_negative}"
+        params = {
+            "prompt": prompt,
+            "negative_prompt": negative_prompt,
+            "num_images": num_images,
+            "steps": steps,
+            "cfg_scale": cfg_scale,
+            "height": height,
+            "width": width,
+            "seed": seed,
+            "long_prompt": long_prompt,
+            "model_id": model_id,
+            "adapters": adapters,
+            "output_type": output_type
+        }
         
-        generator = None
-        if seed is not None:
-            generator = torch.Generator(device=self.device).manual_seed(seed)
+        with self.request_log.capture("generate", **params) as record:
+            return self._generate(record, **params)
+    
+    def _generate(
+        self,
+        record: dict,
+        prompt: str,
+        negative_prompt: Optional[str],
+        num_images: int,
+        steps: int,
+        cfg_scale: float,
+        height: int,
+        width: int,
+        seed: Optional[int],
+        long_prompt: Optional[bool],
+        model_id: Optional[str],
+        adapters: Optional[Dict[str, float]],
+        output_type: str
+    ):
         
-        print(f"\n🎨 Generating {num_images} image(s)...")
-        print(f"   Prompt: {prompt[:100]}...")
-        print(f"   Steps: {steps}, CFG: {cfg_scale}, Size: {width}x{height}")
+        model_id = model_id or self.model_id
+        record["cache"]["model_resident"] = model_id in self.registry.resident_models()
+        start = time.perf_counter()
+        lease = self.registry.acquire(model_id)
+        pipe, adapter_manager = lease["pipe"], lease["adapters"]
+        keep_lease = False
         
         try:
-            images = self.pipe(
-                prompt=prompt,
-                negative_prompt=negative_prompt,
-                num_inference_steps=steps,
-                guidance_scale=cfg_scale,
-                height=height,
-                width=width,
-                num_images_per_prompt=num_images,
-                generator=generator
-            ).images
+            prompt_compiler = self.get_prompt_compiler(model_id, pipe)
+            record["timings"]["model_s"] = time.perf_counter() - start
+        
+            if negative_prompt is None:
+                negative_prompt = GENERATION_CONFIG["negative_prompt_default"]
+        
+            if long_prompt is None:
+                long_prompt = PROMPT_CONFIG["long_prompts"]
+        
+            safety_negative = "nsfw, nude, naked, sexual, explicit, adult content, inappropriate, vulgar, offensive, violence, gore, disturbing"
+            negative_fragments = prompt_compiler.split_fragments(negative_prompt)
+            safety_fragments = prompt_compiler.split_fragments(safety_negative)
+            negative_prompt = ", ".join(negative_fragments + safety_fragments)
+        
+            if long_prompt:
+                prompt_embeds, negative_embeds = prompt_compiler.encode_chunked(
+                    pipe.text_encoder, prompt, negative_prompt, self.device
+                )
+                prompt_inputs = {"prompt_embeds": prompt_embeds, "negative_prompt_embeds": negative_embeds}
+            else:
+                compiled = prompt_compiler.compile(prompt)
+                compiled_negative = prompt_compiler.compile(
+                    negative_fragments + safety_fragments,
+                    [1] * len(negative_fragments) + [2] * len(safety_fragments)
+                )
+                record["cache"]["fragments_dropped"] = len(compiled["dropped"])
+                if compiled["dropped"]:
+                    print(f"   ✂ Dropped {len(compiled['dropped'])} low-priority fragment(s) to fit {compiled['token_budget']} tokens")
+                prompt = compiled["prompt"]
+                prompt_inputs = {"prompt": prompt, "negative_prompt": compiled_negative["prompt"]}
+        
+            generator = None
+            if seed is not None:
+                generator = torch.Generator(device=self.device).manual_seed(seed)
+        
+            print(f"\n🎨 Generating {num_images} image(s)...")
+            print(f"   Prompt: {prompt[:100]}...")
+            print(f"   Model: {model_id}, Steps: {steps}, CFG: {cfg_scale}, Size: {width}x{height}")
+        
+            wait_start = time.perf_counter()
+            with adapter_manager.lock:
+                record["timings"]["lock_wait_s"] = time.perf_counter() - wait_start
+                record["cache"]["adapters_active"] = adapter_manager.active == AdapterManager.combo_key(adapters)
+                fused_hits = adapter_manager.stats["fused_hits"]
+                swap_start = time.perf_counter()
+                adapter_manager.activate(adapters)
+                record["timings"]["adapter_swap_s"] = time.perf_counter() - swap_start
+                record["cache"]["fused_hit"] = adapter_manager.stats["fused_hits"] > fused_hits
+                
+                pipe_start = time.perf_counter()
+                images = pipe(
+                    **prompt_inputs,
+                    num_inference_steps=steps,
+                    guidance_scale=cfg_scale,
+                    height=height,
+                    width=width,
+                    num_images_per_prompt=num_images,
+                    generator=generator,
+                    output_type=output_type
+                ).images
+                record["timings"]["pipe_s"] = time.perf_counter() - pipe_start
+            record["num_generated"] = len(images)
             
             print(f"✅ Generated {len(images)} image(s) successfully!")
+            if output_type == "latent":
+                keep_lease = True
+                return images, lease
             return images
             
         except Exception as e:
             print(f"❌ Error during generation: {e}")
             raise e
+        finally:
+            if not keep_lease:
+                self.registry.release(lease)
+    
+    @property
+    def pipelined_decode(self) -> bool:
+        if DECODE_CONFIG["pipelined"] is not None:
+            return DECODE_CONFIG["pipelined"]
+        return self.device == "cuda"
+    
+    def submit_decode(
+        self,
+        latents: torch.Tensor,
+        lease: dict,
+        postprocess: Optional[Callable] = None
+    ) -> Future:
+        model_id = lease["model_id"]
+        request_id = self.request_log.last_id()
+        
+        def log_decode(timings, outcome):
+            self.registry.release(lease)
+            error = timings.pop("error", None)
+            record = {
+                "event": "decode",
+                "request_id": request_id,
+                "ts": time.time(),
+                "params": {"model_id": model_id, "num_images": len(latents)},
+                "timings": timings,
+                "outcome": outcome
+            }
+            if error:
+                record["error"] = error
+            self.request_log.append(record)
+        
+        try:
+            return self.decoder.submit(lease["pipe"].vae, latents, postprocess, log_decode)
+        except Exception:
+            self.registry.release(lease)
+            raise
+    
+    def generate_pipelined(
+        self,
+        requests: List[dict],
+        postprocess: Optional[Callable[[int, List[Image.Image]], Any]] = None
+    ) -> List:
+        
+        futures = []
+        for i, request in enumerate(requests):
+            latents, lease = self.generate(**request, output_type="latent")
+            futures.append(self.submit_decode(
+                latents,
+                lease,
+                partial(postprocess, i) if postprocess else None
+            ))
+        
+        return [future.result() for future in futures]
+    
+    def schedule(self, requests: List[dict]) -> List[int]:
+        active = self.registry.active_adapters()
+        
+        def schedule_key(i):
+            model_id = requests[i].get("model_id") or self.model_id
+            combo = AdapterManager.combo_key(requests[i].get("adapters"))
+            is_resident = model_id in active
+            return (not is_resident, model_id, not (is_resident and active[model_id] == combo), combo)
+        
+        return sorted(range(len(requests)), key=schedule_key)
+    
+    def generate_batch(self, requests: List[dict]) -> List[List[Image.Image]]:
+        
+        order = self.schedule(requests)
+        results = [None] * len(requests)
+        
+        for i in order:
+            results[i] = self.generate(**requests[i])
+        
+        return results
     
     def save_image(
         self,
@@ -105,7 +290,8 @@ class ImageGenerator:
         prompt: str,
         params: dict,
         output_dir: Optional[str] = None,
-        article_name: Optional[str] = None
+        article_name: Optional[str] = None,
+        model_id: Optional[str] = None
     ) -> tuple:
         
         if output_dir is None:
@@ -123,6 +309,12 @@ class ImageGenerator:
             safe_prompt = "".join([c for c in prompt[:20] if c.isalnum() or c in (' ', '_')]).strip().replace(" ", "_")
             base_filename = f"{timestamp}_{safe_prompt}"
         
+        candidate, suffix = base_filename, 1
+        while os.path.exists(os.path.join(output_dir, f"{candidate}.png")):
+            candidate = f"{base_filename}_{suffix}"
+            suffix += 1
+        base_filename = candidate
+        
         image_path = os.path.join(output_dir, f"{base_filename}.png")
         image.save(image_path, quality=95)
         
@@ -131,7 +323,7 @@ class ImageGenerator:
             "timestamp": timestamp,
             "parameters": params,
             "image_path": image_path,
-            "model_id": self.model_id,
+            "model_id": model_id or self.model_id,
             "article_source": article_name
         }
         
@@ -149,20 +341,27 @@ class ImageGenerator:
         **generation_kwargs
     ) -> List[dict]:
         
-        results = []
+        requested_adapters = generation_kwargs.pop("adapters", None)
+        requests = []
         
-        for i, prompt_data in enumerate(prompts_data):
-            print(f"\n📄 Processing concept {i+1}/{len(prompts_data)} from '{article_name}'")
+        for prompt_data in prompts_data:
+            adapters = requested_adapters
+            if adapters is None:
+                adapters = ADAPTER_CONFIG["style_adapters"].get(prompt_data["style"])
             
-            images = self.generate(
-                prompt=prompt_data["enhanced_prompt"],
-                negative_prompt=prompt_data["negative_prompt"],
-                num_images=1,
+            requests.append({
+                "prompt": prompt_data["enhanced_prompt"],
+                "negative_prompt": prompt_data["negative_prompt"],
+                "num_images": 1,
+                "adapters": adapters,
                 **generation_kwargs
-            )
-            
+            })
+        
+        def save_result(i, images):
+            prompt_data = prompts_data[i]
             params = {
                 **generation_kwargs,
+                "adapters": requests[i]["adapters"],
                 "concept": prompt_data["original_concept"],
                 "style": prompt_data["style"]
             }
@@ -171,15 +370,26 @@ class ImageGenerator:
                 images[0],
                 prompt_data["enhanced_prompt"],
                 params,
-                article_name=article_name
+                article_name=article_name,
+                model_id=generation_kwargs.get("model_id")
             )
             
-            results.append({
+            return {
                 "concept_index": i,
                 "concept": prompt_data["original_concept"],
                 "prompt": prompt_data["enhanced_prompt"],
                 "image_path": img_path,
                 "metadata_path": meta_path
-            })
+            }
         
-        return results
+        print(f"\n📄 Processing {len(prompts_data)} concept(s) from '{article_name}'")
+        
+        order = self.schedule(requests)
+        scheduled = [requests[i] for i in order]
+        
+        if self.pipelined_decode:
+            outputs = self.generate_pipelined(scheduled, lambda j, images: save_result(order[j], images))
+        else:
+            outputs = [save_result(i, self.generate(**requests[i])) for i in order]
+        
+        return sorted(outputs, key=lambda result: result["concept_index"])
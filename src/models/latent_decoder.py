@@ -0,0 +1,73 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+import torch
+from PIL import Image
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import DECODE_CONFIG
+
+
+class LatentDecoder:
+
+    def __init__(self, device: str, chunk_size: Optional[int] = None):
+        self.device = device
+        self.chunk_size = chunk_size or DECODE_CONFIG["chunk_size"]
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vae-decode")
+        self.stream = torch.cuda.Stream() if device == "cuda" else None
+
+    def submit(
+        self,
+        vae,
+        latents: torch.Tensor,
+        postprocess: Optional[Callable] = None,
+        on_complete: Optional[Callable[[dict, str], None]] = None
+    ) -> Future:
+        ready = None
+        if self.stream is not None:
+            ready = torch.cuda.Event()
+            ready.record()
+        return self.executor.submit(self._run, vae, latents, ready, postprocess, on_complete)
+
+    def _run(self, vae, latents: torch.Tensor, ready, postprocess: Optional[Callable], on_complete: Optional[Callable]):
+        timings = {}
+        outcome = "ok"
+        try:
+            start = time.perf_counter()
+            if self.stream is not None:
+                with torch.cuda.stream(self.stream):
+                    self.stream.wait_event(ready)
+                    latents.record_stream(self.stream)
+                    images = self.decode(vae, latents)
+            else:
+                images = self.decode(vae, latents)
+            timings["decode_s"] = time.perf_counter() - start
+
+            if not postprocess:
+                return images
+            start = time.perf_counter()
+            result = postprocess(images)
+            timings["postprocess_s"] = time.perf_counter() - start
+            return result
+        except Exception as e:
+            outcome = "error"
+            timings["error"] = str(e)
+            raise
+        finally:
+            if on_complete:
+                on_complete(timings, outcome)
+
+    def decode(self, vae, latents: torch.Tensor) -> List[Image.Image]:
+        images = []
+        with torch.no_grad():
+            for chunk in latents.split(self.chunk_size):
+                decoded = vae.decode(chunk.to(vae.dtype) / vae.config.scaling_factor, return_dict=False)[0]
+                pixels = decoded.div_(2).add_(0.5).clamp_(0, 1).mul_(255).round_().to(torch.uint8)
+                arrays = pixels.permute(0, 2, 3, 1).contiguous().cpu().numpy()
+                images.extend(Image.fromarray(array) for array in arrays)
+                del decoded, pixels
+        return images
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,241 @@
+import gc
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import torch
+from diffusers import StableDiffusionPipeline, DPMSolverMultistepScheduler
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import MODEL_CONFIG, MODEL_REGISTRY_CONFIG
+from src.models.adapter_manager import AdapterManager
+
+
+class ModelRegistry:
+
+    def __init__(
+        self,
+        device: Optional[str] = None,
+        max_resident: Optional[int] = None,
+        memory_budget_gb: Optional[float] = None
+    ):
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.torch_dtype = torch.float16 if self.device == "cuda" else torch.float32
+        self.max_resident = max_resident or MODEL_REGISTRY_CONFIG["max_resident"]
+
+        if memory_budget_gb is None:
+            memory_budget_gb = MODEL_REGISTRY_CONFIG["memory_budget_gb"]
+        if memory_budget_gb is None and self.device == "cuda":
+            total = torch.cuda.get_device_properties(0).total_memory
+            memory_budget_gb = total * MODEL_REGISTRY_CONFIG["memory_budget_fraction"] / 1024**3
+        self.memory_budget = int(memory_budget_gb * 1024**3) if memory_budget_gb else None
+
+        self.pipelines: "OrderedDict[str, Dict]" = OrderedDict()
+        self.components: Dict[str, Dict] = {}
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0, "last_swap_seconds": 0.0, "shared_hits": 0}
+        self._lock = threading.RLock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def module_bytes(module) -> int:
+        if not isinstance(module, torch.nn.Module):
+            return 0
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+    @staticmethod
+    def fingerprint(component) -> str:
+        digest = hashlib.sha256()
+        digest.update(type(component).__name__.encode())
+
+        if isinstance(component, torch.nn.Module):
+            for name, tensor in component.state_dict().items():
+                tensor = tensor.detach().cpu().contiguous().reshape(-1)
+                digest.update(f"{name}:{tensor.dtype}:{tensor.numel()}".encode())
+                digest.update(tensor.view(torch.uint8).numpy().tobytes())
+        else:
+            vocab = sorted(component.get_vocab().items())
+            digest.update(repr(vocab).encode())
+            digest.update(str(component.model_max_length).encode())
+
+        return digest.hexdigest()
+
+    def get(self, model_id: Optional[str] = None) -> StableDiffusionPipeline:
+        model_id = model_id or MODEL_CONFIG["model_id"]
+
+        with self._lock:
+            if model_id in self.pipelines:
+                self.pipelines.move_to_end(model_id)
+                self.stats["hits"] += 1
+                return self.pipelines[model_id]["pipe"]
+            load_lock = self._load_locks.setdefault(model_id, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                if model_id in self.pipelines:
+                    self.pipelines.move_to_end(model_id)
+                    self.stats["hits"] += 1
+                    return self.pipelines[model_id]["pipe"]
+
+            start = time.perf_counter()
+            pipe, fingerprints = self._load(model_id)
+
+            with self._lock:
+                component_ids, own_bytes = self._share(model_id, pipe, fingerprints)
+                try:
+                    self._evict_for(own_bytes)
+                    self._prepare(pipe)
+                except Exception:
+                    self._release_components(model_id, component_ids)
+                    raise
+
+                swap_seconds = time.perf_counter() - start
+                self.pipelines[model_id] = {
+                    "model_id": model_id,
+                    "pipe": pipe,
+                    "adapters": AdapterManager(pipe),
+                    "components": component_ids,
+                    "own_bytes": own_bytes,
+                    "load_seconds": swap_seconds,
+                    "in_use": 0
+                }
+                self.stats["loads"] += 1
+                self.stats["last_swap_seconds"] = swap_seconds
+
+                print(f"   ✓ {model_id} resident in {swap_seconds:.1f}s "
+                      f"({self.resident_bytes() / 1024**3:.2f} GB across {len(self.pipelines)} model(s))")
+                return pipe
+
+    def acquire(self, model_id: Optional[str] = None) -> Dict:
+        model_id = model_id or MODEL_CONFIG["model_id"]
+        while True:
+            pipe = self.get(model_id)
+            with self._lock:
+                entry = self.pipelines.get(model_id)
+                if entry is not None and entry["pipe"] is pipe:
+                    entry["in_use"] += 1
+                    return entry
+
+    def release(self, entry: Dict):
+        with self._lock:
+            entry["in_use"] -= 1
+
+    def resident_text_encoder(self, model_id: Optional[str] = None):
+        while True:
+            with self._lock:
+                candidates = [model_id] if model_id in self.pipelines else []
+                candidates += list(reversed(self.pipelines))
+                if candidates:
+                    entry = self.pipelines[candidates[0]]
+                    key = entry["components"].get("text_encoder", candidates[0])
+                    return key, entry["pipe"].tokenizer, entry["pipe"].text_encoder
+            self.get(model_id)
+
+    def _load(self, model_id: str):
+        print(f"   Loading {model_id} into registry...")
+        pipe = StableDiffusionPipeline.from_pretrained(
+            model_id,
+            torch_dtype=self.torch_dtype,
+            safety_checker=None,
+        )
+
+        fingerprints = {}
+        for name in MODEL_REGISTRY_CONFIG["shared_components"]:
+            component = getattr(pipe, name, None)
+            if component is not None:
+                fingerprints[name] = self.fingerprint(component)
+        return pipe, fingerprints
+
+    def _share(self, model_id: str, pipe: StableDiffusionPipeline, fingerprints: Dict[str, str]):
+        for name, fp in fingerprints.items():
+            if fp in self.components:
+                setattr(pipe, name, self.components[fp]["module"])
+                self.stats["shared_hits"] += 1
+                print(f"   ♻ Sharing {name} with {', '.join(sorted(self.components[fp]['refs']))}")
+            else:
+                component = getattr(pipe, name)
+                self.components[fp] = {"module": component, "refs": set(), "bytes": self.module_bytes(component)}
+            self.components[fp]["refs"].add(model_id)
+
+        own_bytes = sum(
+            self.module_bytes(module) for name, module in pipe.components.items()
+            if name not in fingerprints
+        )
+        return dict(fingerprints), own_bytes
+
+    def _prepare(self, pipe: StableDiffusionPipeline):
+        pipe.scheduler = DPMSolverMultistepScheduler.from_config(pipe.scheduler.config)
+        pipe.to(self.device)
+
+        if self.device == "cuda":
+            pipe.enable_attention_slicing()
+            pipe.enable_vae_slicing()
+            try:
+                pipe.enable_xformers_memory_efficient_attention()
+                print("   ✓ XFormers enabled for better performance")
+            except Exception:
+                print("   ⚠ XFormers not available, using standard attention")
+
+    def _evict_for(self, own_bytes: int):
+        while self.pipelines and (
+            len(self.pipelines) >= self.max_resident
+            or (self.memory_budget and self.resident_bytes() + own_bytes > self.memory_budget)
+        ):
+            idle = [model_id for model_id, entry in self.pipelines.items() if not entry["in_use"]]
+            if not idle:
+                print("   ⚠ Every resident model is in use, loading over budget")
+                return
+            self.evict(idle[0])
+
+    def evict(self, model_id: str):
+        with self._lock:
+            entry = self.pipelines.pop(model_id, None)
+            if entry is None:
+                return
+
+            self._release_components(model_id, entry["components"])
+            del entry
+            self.stats["evictions"] += 1
+            gc.collect()
+            if self.device == "cuda":
+                torch.cuda.empty_cache()
+            print(f"   ⏏ Evicted {model_id}")
+
+    def _release_components(self, model_id: str, component_ids: Dict[str, str]):
+        for fp in component_ids.values():
+            shared = self.components.get(fp)
+            if shared is None:
+                continue
+            shared["refs"].discard(model_id)
+            if not shared["refs"]:
+                del self.components[fp]
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return (
+                sum(entry["own_bytes"] for entry in self.pipelines.values())
+                + sum(c["bytes"] for c in self.components.values())
+            )
+
+    def resident_models(self) -> List[str]:
+        with self._lock:
+            return list(self.pipelines)
+
+    def active_adapters(self) -> Dict[str, tuple]:
+        with self._lock:
+            return {model_id: entry["adapters"].active for model_id, entry in self.pipelines.items()}
+
+    def report(self) -> Dict:
+        with self._lock:
+            report = {
+                **self.stats,
+                "resident_models": self.resident_models(),
+                "resident_gb": self.resident_bytes() / 1024**3,
+                "shared_components": sum(1 for c in self.components.values() if len(c["refs"]) > 1),
+                "memory_budget_gb": self.memory_budget / 1024**3 if self.memory_budget else None,
+            }
+        if self.device == "cuda":
+            report["cuda_allocated_gb"] = torch.cuda.memory_allocated() / 1024**3
+        return report
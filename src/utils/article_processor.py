@@ -3,6 +3,7 @@ from typing import List, Dict
 from docx import Document
 from groq import Groq
 from dotenv import load_dotenv
+from src.utils.corpus_index import CorpusIndex
 
 load_dotenv()
 
@@ -15,6 +16,7 @@ class ArticleProcessor:
         if not api_key:
             raise ValueError("GROQ_API_KEY not found in environment variables. Please set it in .env file")
         self.client = Groq(api_key=api_key)
+        self.index = CorpusIndex(articles_dir, reader=self.read_docx)
 
     def read_docx(self, filepath: str) -> str:
         try:
@@ -25,7 +27,8 @@ class ArticleProcessor:
             return ""
 
     def process_article(self, filepath: str, max_concepts: int = 3) -> Dict:
-        text = self.read_docx(filepath)
+        entry = self.index.get(filepath)
+        text = entry["text"] if entry else self.read_docx(filepath)
         filename = os.path.basename(filepath)
         
         if not text:
@@ -67,6 +70,8 @@ YOUR OUTPUT (prompts only, separated by |):"""
             if not concepts:
                 return {"error": "No valid prompts generated", "concepts": []}
             
+            self.index.record_concepts(filepath, concepts[:max_concepts])
+            
             return {
                 "filename": filename,
                 "concepts": concepts[:max_concepts],
@@ -79,6 +84,10 @@ YOUR OUTPUT (prompts only, separated by |):"""
             return {"error": str(e), "concepts": []}
 
     def get_all_articles(self) -> List[str]:
-        if not os.path.exists(self.articles_dir):
-            return []
-        return [os.path.join(self.articles_dir, f) for f in os.listdir(self.articles_dir) if f.endswith('.docx') and not f.startswith('~')]
+        self.index.scan()
+        return self.index.paths()
+
+    def get_changed_articles(self, scan: bool = True) -> List[str]:
+        if scan:
+            self.index.scan()
+        return self.index.changed_articles()
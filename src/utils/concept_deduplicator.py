@@ -0,0 +1,102 @@
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional
+import torch
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config.settings import DEDUP_CONFIG
+
+
+class ConceptDeduplicator:
+
+    def __init__(self, encoder_getter: Callable, device: str, threshold: Optional[float] = None):
+        self.encoder_getter = encoder_getter
+        self.device = device
+        self.threshold = threshold or DEDUP_CONFIG["similarity_threshold"]
+        self.history: Dict[str, deque] = {}
+        self._embeddings: "OrderedDict[tuple, torch.Tensor]" = OrderedDict()
+
+    def embed(self, concepts: List[str], model_id: Optional[str] = None) -> torch.Tensor:
+        encoder_key, tokenizer, text_encoder = self.encoder_getter(model_id)
+
+        found, missing = {}, []
+        for concept in dict.fromkeys(concepts):
+            key = (encoder_key, concept)
+            if key in self._embeddings:
+                self._embeddings.move_to_end(key)
+                found[concept] = self._embeddings[key]
+            else:
+                missing.append(concept)
+
+        if missing:
+            tokens = tokenizer(
+                missing,
+                padding="max_length",
+                max_length=tokenizer.model_max_length,
+                truncation=True,
+                return_tensors="pt"
+            )
+            with torch.no_grad():
+                pooled = text_encoder(tokens.input_ids.to(self.device))[1].float()
+            pooled = torch.nn.functional.normalize(pooled, dim=-1).cpu()
+
+            found.update(zip(missing, pooled))
+            self._embeddings.update(((encoder_key, c), p) for c, p in zip(missing, pooled))
+            while len(self._embeddings) > DEDUP_CONFIG["embedding_cache_size"]:
+                self._embeddings.popitem(last=False)
+
+        return torch.stack([found[c] for c in concepts])
+
+    def deduplicate(
+        self,
+        concepts: List[str],
+        article_name: Optional[str] = None,
+        model_id: Optional[str] = None
+    ) -> Dict:
+        if not concepts:
+            return {"kept": [], "dropped": [], "renders_avoided": 0}
+
+        history = list(self.history.get(article_name, [])) if article_name else []
+        embeddings = self.embed(concepts + history, model_id)
+        batch, previous = embeddings[:len(concepts)], embeddings[len(concepts):]
+
+        batch_sim = batch @ batch.T
+        if history:
+            history_sim = batch @ previous.T
+            best_history, best_history_idx = history_sim.max(dim=1)
+        else:
+            best_history = torch.full((len(concepts),), -1.0)
+
+        kept_idx, dropped = [], []
+        for i, concept in enumerate(concepts):
+            if best_history[i] >= self.threshold:
+                dropped.append({
+                    "concept": concept,
+                    "duplicate_of": history[int(best_history_idx[i])],
+                    "similarity": float(best_history[i])
+                })
+                continue
+
+            if kept_idx:
+                row = batch_sim[i, kept_idx]
+                score, j = row.max(dim=0)
+                if score >= self.threshold:
+                    dropped.append({
+                        "concept": concept,
+                        "duplicate_of": concepts[kept_idx[int(j)]],
+                        "similarity": float(score)
+                    })
+                    continue
+
+            kept_idx.append(i)
+
+        return {
+            "kept": [concepts[i] for i in kept_idx],
+            "dropped": dropped,
+            "renders_avoided": len(dropped)
+        }
+
+    def record(self, article_name: str, concepts: List[str]):
+        if article_name not in self.history:
+            self.history[article_name] = deque(maxlen=DEDUP_CONFIG["history_size"])
+        self.history[article_name].extend(concepts)
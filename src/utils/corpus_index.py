@@ -0,0 +1,204 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config.settings import PATHS
+
+
+class CorpusIndex:
+
+    VERSION = 2
+
+    def __init__(
+        self,
+        articles_dir: str,
+        reader: Callable[[str], str],
+        index_path: Optional[str] = None,
+        text_dir: Optional[str] = None
+    ):
+        self.articles_dir = articles_dir
+        self.reader = reader
+        self.index_path = index_path or PATHS["corpus_index"]
+        self.text_dir = text_dir or PATHS["corpus_text"]
+        self.entries: Dict[str, Dict] = {}
+        self._dirty = False
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION:
+                self.entries = data.get("entries", {})
+        except (OSError, ValueError) as e:
+            print(f"Error reading corpus index {self.index_path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            index_dir = os.path.dirname(self.index_path)
+            if index_dir:
+                os.makedirs(index_dir, exist_ok=True)
+
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.VERSION, "entries": self.entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+
+    @staticmethod
+    def file_hash(filepath: str) -> str:
+        digest = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _text_path(self, content_hash: str) -> str:
+        return os.path.join(self.text_dir, f"{content_hash}.txt")
+
+    def _write_text(self, content_hash: str, text: str):
+        text_path = self._text_path(content_hash)
+        if os.path.exists(text_path):
+            return
+        os.makedirs(self.text_dir, exist_ok=True)
+        tmp_path = f"{text_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, text_path)
+
+    def read_text(self, content_hash: str) -> Optional[str]:
+        try:
+            with open(self._text_path(content_hash), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _drop_text(self, content_hash: str):
+        if any(entry["content_hash"] == content_hash for entry in self.entries.values()):
+            return
+        try:
+            os.remove(self._text_path(content_hash))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _is_stale(entry: Optional[Dict], stat: os.stat_result) -> bool:
+        return not (entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size)
+
+    def _build(self, filepath: str, stat: os.stat_result, previous: Optional[Dict]) -> Dict:
+        content_hash = self.file_hash(filepath)
+
+        if previous and previous["content_hash"] == content_hash and os.path.exists(self._text_path(content_hash)):
+            return {**previous, "mtime": stat.st_mtime, "size": stat.st_size}
+
+        text = self.reader(filepath)
+        self._write_text(content_hash, text)
+        return {
+            "path": filepath,
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "content_hash": content_hash,
+            "word_count": len(text.split()),
+            "indexed_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def _swap(self, filepath: str, entry: Dict) -> str:
+        current = self.entries.get(filepath)
+        entry["concepts"] = current["concepts"] if current else None
+        entry["concepts_hash"] = current["concepts_hash"] if current else None
+        self.entries[filepath] = entry
+        self._dirty = True
+
+        if not current:
+            return "added"
+        if current["content_hash"] == entry["content_hash"]:
+            return "unchanged"
+        self._drop_text(current["content_hash"])
+        return "changed"
+
+    def scan(self) -> Dict[str, List[str]]:
+        report = {"added": [], "changed": [], "removed": [], "unchanged": []}
+
+        found = {}
+        if os.path.exists(self.articles_dir):
+            for e in os.scandir(self.articles_dir):
+                if not e.is_file() or not e.name.endswith(".docx") or e.name.startswith("~"):
+                    continue
+                found[e.path] = e.stat()
+
+        with self._lock:
+            stale = {}
+            for filepath, stat in found.items():
+                entry = self.entries.get(filepath)
+                if self._is_stale(entry, stat):
+                    stale[filepath] = dict(entry) if entry else None
+                else:
+                    report["unchanged"].append(filepath)
+
+        built = {filepath: self._build(filepath, found[filepath], previous) for filepath, previous in stale.items()}
+
+        with self._lock:
+            for filepath, entry in built.items():
+                report[self._swap(filepath, entry)].append(filepath)
+
+            for filepath in [p for p in self.entries if p not in found]:
+                entry = self.entries.pop(filepath)
+                self._drop_text(entry["content_hash"])
+                report["removed"].append(filepath)
+                self._dirty = True
+
+            self.save()
+        return report
+
+    def get(self, filepath: str) -> Optional[Dict]:
+        if not os.path.exists(filepath):
+            return None
+        stat = os.stat(filepath)
+
+        with self._lock:
+            entry = self.entries.get(filepath)
+            entry = dict(entry) if entry else None
+
+        if self._is_stale(entry, stat):
+            built = self._build(filepath, stat, entry)
+            with self._lock:
+                self._swap(filepath, built)
+                self.save()
+                entry = dict(self.entries[filepath])
+
+        text = self.read_text(entry["content_hash"])
+        if text is None:
+            text = self.reader(filepath)
+            self._write_text(entry["content_hash"], text)
+        return {**entry, "text": text}
+
+    def paths(self) -> List[str]:
+        with self._lock:
+            return sorted(self.entries)
+
+    def record_concepts(self, filepath: str, concepts: List[str]):
+        with self._lock:
+            entry = self.entries.get(filepath)
+            if entry is None:
+                return
+            entry["concepts"] = concepts
+            entry["concepts_hash"] = entry["content_hash"]
+            self._dirty = True
+            self.save()
+
+    def changed_articles(self) -> List[str]:
+        with self._lock:
+            return [
+                p for p, entry in sorted(self.entries.items())
+                if entry["concepts_hash"] != entry["content_hash"]
+            ]
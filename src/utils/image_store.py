@@ -0,0 +1,92 @@
+import os
+import json
+import threading
+from typing import List, Dict, Optional
+from PIL import Image
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config.settings import IMAGE_STORE_CONFIG, PATHS
+
+
+class ImageStore:
+
+    def __init__(self, output_dir: Optional[str] = None, thumbnail_size: Optional[int] = None):
+        self.output_dir = output_dir or PATHS["output_dir"]
+        self.thumbnail_dir = os.path.join(self.output_dir, IMAGE_STORE_CONFIG["thumbnail_dir"])
+        self.thumbnail_size = thumbnail_size or IMAGE_STORE_CONFIG["thumbnail_size"]
+
+    def thumbnail_path(self, image_path: str) -> str:
+        base = os.path.splitext(os.path.basename(image_path))[0]
+        return os.path.join(self.thumbnail_dir, f"{base}_{self.thumbnail_size}.webp")
+
+    def get_thumbnail(self, image_path: str, image: Optional[Image.Image] = None) -> str:
+        thumb_path = self.thumbnail_path(image_path)
+
+        if os.path.exists(thumb_path) and os.path.getmtime(thumb_path) >= os.path.getmtime(image_path):
+            return thumb_path
+
+        os.makedirs(self.thumbnail_dir, exist_ok=True)
+
+        if image is None:
+            with Image.open(image_path) as source:
+                source.draft("RGB", (self.thumbnail_size, self.thumbnail_size))
+                thumb = source.convert("RGB")
+                thumb.thumbnail((self.thumbnail_size, self.thumbnail_size))
+        else:
+            thumb = image.copy()
+            thumb.thumbnail((self.thumbnail_size, self.thumbnail_size))
+
+        tmp_path = f"{thumb_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        thumb.save(tmp_path, "WEBP", quality=IMAGE_STORE_CONFIG["thumbnail_quality"])
+        os.replace(tmp_path, thumb_path)
+        return thumb_path
+
+    def list_images(self) -> List[str]:
+        if not os.path.exists(self.output_dir):
+            return []
+
+        entries = [
+            e for e in os.scandir(self.output_dir)
+            if e.is_file() and e.name.endswith(".png")
+        ]
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        return [e.path for e in entries]
+
+    def load_metadata(self, image_path: str) -> Dict:
+        metadata_path = os.path.splitext(image_path)[0] + ".json"
+        if not os.path.exists(metadata_path):
+            return {}
+        try:
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error reading {metadata_path}: {e}")
+            return {}
+
+    def page(self, page: int, page_size: Optional[int] = None) -> Dict:
+        page_size = page_size or IMAGE_STORE_CONFIG["gallery_page_size"]
+        images = self.list_images()
+        num_pages = max(1, -(-len(images) // page_size))
+        page = min(max(page, 1), num_pages)
+
+        items = []
+        for image_path in images[(page - 1) * page_size:page * page_size]:
+            metadata = self.load_metadata(image_path)
+            items.append({
+                "path": image_path,
+                "thumbnail": self.get_thumbnail(image_path),
+                "prompt": metadata.get("prompt", ""),
+                "article": metadata.get("article_source"),
+                "timestamp": metadata.get("timestamp")
+            })
+
+        return {
+            "items": items,
+            "page": page,
+            "num_pages": num_pages,
+            "total": len(images)
+        }
+
+    def read_bytes(self, image_path: str) -> bytes:
+        with open(image_path, "rb") as f:
+            return f.read()
@@ -0,0 +1,103 @@
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import torch
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config.settings import PROMPT_CONFIG
+
+
+class PromptCompiler:
+
+    def __init__(self, tokenizer, token_budget: Optional[int] = None, cache_size: Optional[int] = None):
+        self.tokenizer = tokenizer
+        self.chunk_size = tokenizer.model_max_length - 2
+        self.token_budget = min(token_budget or PROMPT_CONFIG["token_budget"] or self.chunk_size, self.chunk_size)
+        self._token_ids = lru_cache(maxsize=cache_size or PROMPT_CONFIG["token_cache_size"])(self._tokenize)
+        self.separator_tokens = len(self._token_ids(","))
+
+    def _tokenize(self, text: str) -> Tuple[int, ...]:
+        return tuple(self.tokenizer(text, add_special_tokens=False, truncation=False)["input_ids"])
+
+    def count_tokens(self, text: str) -> int:
+        return len(self._token_ids(text))
+
+    def split_fragments(self, prompt: str) -> List[str]:
+        return [f.strip() for f in prompt.split(",") if f.strip()]
+
+    def compile(
+        self,
+        fragments: Union[str, Sequence[str]],
+        priorities: Optional[Sequence[float]] = None,
+        token_budget: Optional[int] = None
+    ) -> Dict:
+        if isinstance(fragments, str):
+            fragments = self.split_fragments(fragments)
+
+        if priorities is None:
+            priorities = [len(fragments) - i for i in range(len(fragments))]
+
+        unique, ranks, seen = [], [], {}
+        for fragment, priority in zip(fragments, priorities):
+            key = fragment.lower()
+            if key in seen:
+                ranks[seen[key]] = max(ranks[seen[key]], priority)
+                continue
+            seen[key] = len(unique)
+            unique.append(fragment)
+            ranks.append(priority)
+
+        budget = min(token_budget or self.token_budget, self.chunk_size)
+        order = sorted(range(len(unique)), key=lambda i: -ranks[i])
+        kept = {}
+        used = 0
+
+        for i in order:
+            ids = self._token_ids(unique[i])
+            cost = len(ids) + (self.separator_tokens if kept else 0)
+            if used + cost <= budget:
+                kept[i] = unique[i]
+                used += cost
+            elif not kept:
+                kept[i] = self.tokenizer.decode(ids[:budget]).strip()
+                used = budget
+
+        return {
+            "prompt": ", ".join(kept[i] for i in sorted(kept)),
+            "num_tokens": used,
+            "token_budget": budget,
+            "kept": [kept[i] for i in sorted(kept)],
+            "dropped": [unique[i] for i in range(len(unique)) if i not in kept or kept[i] != unique[i]]
+        }
+
+    def encode_chunked(
+        self,
+        text_encoder,
+        prompt: str,
+        negative_prompt: str,
+        device: str
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        ids = [self._token_ids(prompt), self._token_ids(negative_prompt)]
+        num_chunks = max(1, *(math.ceil(len(x) / self.chunk_size) for x in ids))
+
+        bos = self.tokenizer.bos_token_id
+        eos = self.tokenizer.eos_token_id
+        pad = self.tokenizer.pad_token_id if self.tokenizer.pad_token_id is not None else eos
+
+        embeds = []
+        for token_ids in ids:
+            chunks = []
+            for c in range(num_chunks):
+                piece = list(token_ids[c * self.chunk_size:(c + 1) * self.chunk_size])
+                chunks.append([bos] + piece + [eos] + [pad] * (self.chunk_size - len(piece)))
+
+            input_ids = torch.tensor(chunks, device=device)
+            with torch.no_grad():
+                hidden = text_encoder(input_ids)[0]
+            embeds.append(hidden.reshape(1, -1, hidden.shape[-1]))
+
+        return embeds[0], embeds[1]
+
+    def cache_info(self):
+        return self._token_ids.cache_info()
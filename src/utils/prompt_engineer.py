@@ -1,10 +1,12 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import random
 
 
 class PromptEngineer:
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        
         self.quality_enhancers = [
             "highly detailed",
             "8k resolution",
@@ -33,50 +35,78 @@ class PromptEngineer:
             "aerial view"
         ]
         
+        self.style_suffixes = {
+            "photorealistic": ["professional photography", "realistic"],
+            "artistic": ["digital art", "concept art", "trending on artstation"],
+            "cinematic": ["cinematic composition", "movie still", "film grain"],
+        }
+        
         self.negative_prompt = (
             "blurry, low quality, distorted, ugly, bad anatomy, "
             "extra limbs, watermark, text, signature, low resolution, "
             "pixelated, jpeg artifacts, out of focus"
         )
     
-    def enhance_concept(self, concept: str, style: str = "photorealistic") -> str:
-        quality = random.sample(self.quality_enhancers, 3)
-        lighting = random.choice(self.style_modifiers)
+    def _rng(self, concept: str, seed: Optional[int] = None):
+        if seed is None:
+            seed = self.seed
+        if seed is None:
+            return random
+        return random.Random(f"{seed}:{concept}")
+    
+    def build_fragments(self, concept: str, style: str = "photorealistic",
+                        add_camera_angle: bool = False,
+                        seed: Optional[int] = None) -> Tuple[List[str], List[int]]:
+        rng = self._rng(concept, seed)
+        quality = rng.sample(self.quality_enhancers, 3)
+        lighting = rng.choice(self.style_modifiers)
         
-        enhanced = f"{concept}, {', '.join(quality)}, {lighting}"
+        fragments = [(concept, 100)]
+        fragments += [(q, 10 - i) for i, q in enumerate(quality)]
+        fragments.append((lighting, 40))
         
-        if style == "photorealistic":
-            enhanced += ", professional photography, realistic"
-        elif style == "artistic":
-            enhanced += ", digital art, concept art, trending on artstation"
-        elif style == "cinematic":
-            enhanced += ", cinematic composition, movie still, film grain"
-        
-        return enhanced
-    
-    def create_prompt(self, concept: str, style: str = "photorealistic", 
-                     add_camera_angle: bool = False) -> str:
-        prompt = self.enhance_concept(concept, style)
+        for i, modifier in enumerate(self.style_suffixes.get(style, [])):
+            fragments.append((modifier, 30 - i))
         
         if add_camera_angle:
-            angle = random.choice(self.camera_angles)
-            prompt = f"{prompt}, {angle}"
+            fragments.append((rng.choice(self.camera_angles), 50))
         
-        return prompt
+        return [f for f, _ in fragments], [p for _, p in fragments]
+    
+    def enhance_concept(self, concept: str, style: str = "photorealistic",
+                        seed: Optional[int] = None) -> str:
+        fragments, _ = self.build_fragments(concept, style, seed=seed)
+        return ", ".join(fragments)
+    
+    def create_prompt(self, concept: str, style: str = "photorealistic", 
+                     add_camera_angle: bool = False,
+                     seed: Optional[int] = None) -> str:
+        fragments, _ = self.build_fragments(concept, style, add_camera_angle, seed)
+        return ", ".join(fragments)
     
     def create_prompts_from_concepts(self, concepts: List[str], 
-                                    style: str = "photorealistic") -> List[Dict]:
+                                    style: str = "photorealistic",
+                                    seed: Optional[int] = None,
+                                    compiler=None) -> List[Dict]:
         prompts = []
         
         for i, concept in enumerate(concepts):
-            prompt = self.create_prompt(concept, style, add_camera_angle=True)
-            prompts.append({
+            fragments, priorities = self.build_fragments(concept, style, True, seed)
+            prompt_data = {
                 "concept_index": i,
                 "original_concept": concept,
-                "enhanced_prompt": prompt,
+                "enhanced_prompt": ", ".join(fragments),
                 "negative_prompt": self.negative_prompt,
                 "style": style
-            })
+            }
+            
+            if compiler is not None:
+                compiled = compiler.compile(fragments, priorities)
+                prompt_data["enhanced_prompt"] = compiled["prompt"]
+                prompt_data["num_tokens"] = compiled["num_tokens"]
+                prompt_data["dropped_fragments"] = compiled["dropped"]
+            
+            prompts.append(prompt_data)
         
         return prompts
     
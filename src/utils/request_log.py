@@ -0,0 +1,73 @@
+import os
+import json
+import time
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from config.settings import REQUEST_LOG_CONFIG
+
+
+class RequestLog:
+
+    _lock = threading.Lock()
+
+    def __init__(self, path: Optional[str] = None, enabled: Optional[bool] = None):
+        self.path = path or REQUEST_LOG_CONFIG["path"]
+        self.enabled = REQUEST_LOG_CONFIG["enabled"] if enabled is None else enabled
+        self._local = threading.local()
+
+    def last_id(self) -> Optional[str]:
+        return getattr(self._local, "last_id", None)
+
+    def append(self, record: Dict):
+        if not self.enabled:
+            return
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    @contextmanager
+    def capture(self, event: str, **params) -> Iterator[Dict]:
+        record = {
+            "id": uuid.uuid4().hex,
+            "event": event,
+            "ts": time.time(),
+            "time": datetime.now().isoformat(timespec="milliseconds"),
+            "params": params,
+            "timings": {},
+            "cache": {},
+        }
+        self._local.last_id = record["id"]
+        start = time.perf_counter()
+        try:
+            yield record
+            record.setdefault("outcome", "ok")
+        except Exception as e:
+            record["outcome"] = "error"
+            record["error"] = str(e)
+            raise
+        finally:
+            record["timings"]["total_s"] = time.perf_counter() - start
+            self.append(record)
+
+    @staticmethod
+    def read(path: str, events: Optional[List[str]] = None) -> List[Dict]:
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(record, dict) or "event" not in record:
+                    continue
+                if events and record["event"] not in events:
+                    continue
+                records.append(record)
+        records.sort(key=lambda r: r["ts"])
+        return records
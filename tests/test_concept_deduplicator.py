@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import DEDUP_CONFIG
+from src.utils.concept_deduplicator import ConceptDeduplicator
+
+
+class FakeTokenizer:
+    model_max_length = 4
+
+    def __init__(self):
+        self.vocab = {}
+
+    def __call__(self, texts, **kwargs):
+        ids = [[self.vocab.setdefault(t, len(self.vocab))] * self.model_max_length for t in texts]
+        return SimpleNamespace(input_ids=torch.tensor(ids))
+
+
+class FakeTextEncoder:
+
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.calls = 0
+
+    def __call__(self, input_ids):
+        self.calls += 1
+        pooled = torch.nn.functional.one_hot(input_ids[:, 0] % self.dim, self.dim).float()
+        return None, pooled
+
+
+def make_deduplicator():
+    pipe = SimpleNamespace(tokenizer=FakeTokenizer(), text_encoder=FakeTextEncoder())
+    return ConceptDeduplicator(lambda model_id: ("te", pipe.tokenizer, pipe.text_encoder), "cpu", threshold=0.9), pipe
+
+
+def test_embed_survives_cache_overflow(monkeypatch):
+    monkeypatch.setitem(DEDUP_CONFIG, "embedding_cache_size", 4)
+    dedup, _ = make_deduplicator()
+
+    dedup.record("article", ["history a", "history b", "history c"])
+    dedup.deduplicate(["first"], "article")
+
+    result = dedup.deduplicate(["new 1", "new 2", "new 3"], "article")
+
+    assert result["kept"] == ["new 1", "new 2", "new 3"]
+    assert len(dedup._embeddings) == 4
+
+
+def test_duplicates_dropped_against_batch_and_history():
+    dedup, _ = make_deduplicator()
+    dedup.record("article", ["seen"])
+
+    result = dedup.deduplicate(["seen", "fresh", "fresh"], "article")
+
+    assert result["kept"] == ["fresh"]
+    assert result["renders_avoided"] == 2
+    assert [d["duplicate_of"] for d in result["dropped"]] == ["seen", "fresh"]
+
+
+def test_cached_embeddings_are_reused():
+    dedup, pipe = make_deduplicator()
+
+    dedup.embed(["a", "b"])
+    dedup.embed(["a", "b"])
+
+    assert pipe.text_encoder.calls == 1
@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.settings import PROMPT_CONFIG
+from src.utils.prompt_compiler import PromptCompiler
+
+
+class FakeTokenizer:
+
+    def __init__(self, model_max_length=20):
+        self.model_max_length = model_max_length
+        self.vocab = {}
+        self.words = {}
+
+    def __call__(self, text, **kwargs):
+        ids = []
+        for word in text.split():
+            if word not in self.vocab:
+                self.vocab[word] = len(self.vocab)
+                self.words[self.vocab[word]] = word
+            ids.append(self.vocab[word])
+        return {"input_ids": ids}
+
+    def decode(self, ids):
+        return " ".join(self.words[i] for i in ids)
+
+
+def make_compiler(model_max_length=20, token_budget=None):
+    return PromptCompiler(FakeTokenizer(model_max_length), token_budget=token_budget)
+
+
+def test_fragments_fit_within_budget():
+    compiled = make_compiler().compile(["a b c", "d e", "f"], token_budget=6)
+
+    assert compiled["kept"] == ["a b c", "d e"]
+    assert compiled["dropped"] == ["f"]
+    assert compiled["num_tokens"] == 6
+
+
+def test_skipped_fragment_does_not_stop_smaller_ones():
+    compiled = make_compiler().compile(["a b c d", "e f g", "h"], token_budget=7)
+
+    assert compiled["kept"] == ["a b c d", "h"]
+    assert compiled["dropped"] == ["e f g"]
+
+
+def test_kept_fragments_keep_original_order():
+    compiled = make_compiler().compile(["x", "y y", "z"], priorities=[1, 3, 2], token_budget=5)
+
+    assert compiled["prompt"] == "y y, z"
+    assert compiled["dropped"] == ["x"]
+
+    compiled = make_compiler().compile(["x", "y", "z"], priorities=[1, 3, 2])
+    assert compiled["prompt"] == "x, y, z"
+
+
+def test_oversized_top_fragment_is_truncated():
+    compiled = make_compiler().compile(["one two three four five six", "seven"], token_budget=4)
+
+    assert compiled["kept"] == ["one two three four"]
+    assert compiled["dropped"] == ["one two three four five six", "seven"]
+    assert compiled["num_tokens"] == 4
+
+
+def test_duplicates_merge_case_insensitively_with_highest_priority():
+    compiled = make_compiler().compile(["Red Car", "sky blue", "red car"], priorities=[1, 2, 5], token_budget=2)
+
+    assert compiled["kept"] == ["Red Car"]
+    assert compiled["dropped"] == ["sky blue"]
+
+
+def test_budget_is_clamped_to_chunk_size(monkeypatch):
+    assert make_compiler(model_max_length=10, token_budget=50).token_budget == 8
+
+    monkeypatch.setitem(PROMPT_CONFIG, "token_budget", 100)
+    compiler = make_compiler(model_max_length=10)
+    assert compiler.token_budget == 8
+
+    words = " ".join(f"w{i}" for i in range(12))
+    compiled = compiler.compile([words], token_budget=100)
+    assert compiled["token_budget"] == 8
+    assert compiled["num_tokens"] == 8